@@ -32,6 +32,8 @@ LAST_NOTIFY_FILE="$CACHE_DIR/powerprofile.lastnotify"
 NOTIFY_COOLDOWN=10
 
 # State files (tray compatibility)
+NOTIFY_ID_FILE="$CACHE_DIR/powerprofile.notifyid"
+
 STATE_FILE="$CACHE_DIR/powerprofile.state"       # actual current profile (read back after apply)
 LAST_APPLIED_FILE="$CACHE_DIR/powerprofile.last" # last target we attempted to set
 OVERRIDE_FILE="$CACHE_DIR/powerprofile.override" # manual override target (validated)
@@ -76,17 +78,38 @@ GPU_TEMP_CACHE_FILE="$CACHE_DIR/powerprofile.gputemp"
 notify() {
   [[ $NOTIFY -eq 1 ]] || return 0
   [[ -f "$SILENT_FILE" ]] && return 0
-  command -v notify-send >/dev/null 2>&1 || return 0
 
   local now last=0
   now=$(date +%s)
   [[ -r "$LAST_NOTIFY_FILE" ]] && last=$(<"$LAST_NOTIFY_FILE")
   (( now - last < NOTIFY_COOLDOWN )) && return 0
 
-  if [[ -n "${2-}" ]]; then
-    notify-send -a "Smart Power Profiles" "$1" "$2" || true
+  if command -v gdbus >/dev/null 2>&1; then
+    # Call org.freedesktop.Notifications directly and pass the previous
+    # notification id back as replaces_id so profile changes update one
+    # bubble in place instead of stacking a new one per switch.
+    local rid=0 out
+    [[ -r "$NOTIFY_ID_FILE" ]] && rid=$(<"$NOTIFY_ID_FILE")
+    [[ "$rid" =~ ^[0-9]+$ ]] || rid=0
+    out=$(gdbus call --session \
+      --dest org.freedesktop.Notifications \
+      --object-path /org/freedesktop/Notifications \
+      --method org.freedesktop.Notifications.Notify \
+      "Smart Power Profiles" "$rid" "" "$1" "${2-}" \
+      "[]" "{}" 5000 2>/dev/null) || out=""
+    # Reply looks like "(uint32 42,)"; anchor on uint32 so we capture the
+    # id value and not the "32" inside the type name.
+    if [[ "$out" =~ uint32\ ([0-9]+) ]]; then
+      echo "${BASH_REMATCH[1]}" > "$NOTIFY_ID_FILE" || true
+    fi
+  elif command -v notify-send >/dev/null 2>&1; then
+    if [[ -n "${2-}" ]]; then
+      notify-send -a "Smart Power Profiles" "$1" "$2" || true
+    else
+      notify-send -a "Smart Power Profiles" "$1" || true
+    fi
   else
-    notify-send -a "Smart Power Profiles" "$1" || true
+    return 0
   fi
   echo "$now" > "$LAST_NOTIFY_FILE" || true
 }
@@ -3,74 +3,202 @@
 # Prefers ~/.cache/powerprofile.state (written by auto-powerprofile.sh) and
 # falls back to `powerprofilesctl get` if that file is missing.
 
+import ctypes
+import ctypes.util
 import os
+import struct
 import sys
-import gi
+import time
+from dataclasses import dataclass
 
-gi.require_version("Gtk", "3.0")
-from gi.repository import Gtk, GLib
+# GTK/GI loading is deferred to main(): importing this module (for a quick
+# check of the file helpers, say) shouldn't drag in the GUI stack, and the
+# missing-typelib exit belongs to the program, not the import.
+Gtk = GLib = IndicatorNS = None
 
-# --- Prefer Ayatana first (Ubuntu 25.10+), then fall back to legacy AppIndicator3 ---
-IndicatorNS = None
-try:
-    gi.require_version("AyatanaAppIndicator3", "0.1")
-    from gi.repository import AyatanaAppIndicator3 as IndicatorNS
-except Exception:
+def load_gi():
+    global Gtk, GLib, IndicatorNS
+    import gi
+
+    gi.require_version("Gtk", "3.0")
+    from gi.repository import Gtk as _Gtk, GLib as _GLib
+    Gtk, GLib = _Gtk, _GLib
+
+    # Prefer Ayatana first (Ubuntu 25.10+), then fall back to legacy AppIndicator3
     try:
-        gi.require_version("AppIndicator3", "0.1")
-        from gi.repository import AppIndicator3 as IndicatorNS
+        gi.require_version("AyatanaAppIndicator3", "0.1")
+        from gi.repository import AyatanaAppIndicator3 as ns
     except Exception:
-        sys.stderr.write(
-            "No compatible AppIndicator binding found.\n"
-            "Install: gir1.2-ayatanaappindicator3-0.1 libayatana-appindicator3-1 python3-gi gir1.2-gtk-3.0\n"
-            "Also verify the typelib exists:\n"
-            "  /usr/lib/x86_64-linux-gnu/girepository-1.0/AyatanaAppIndicator3-0.1.typelib\n"
-        )
-        sys.exit(1)
+        try:
+            gi.require_version("AppIndicator3", "0.1")
+            from gi.repository import AppIndicator3 as ns
+        except Exception:
+            sys.stderr.write(
+                "No compatible AppIndicator binding found.\n"
+                "Install: gir1.2-ayatanaappindicator3-0.1 libayatana-appindicator3-1 python3-gi gir1.2-gtk-3.0\n"
+                "Also verify the typelib exists:\n"
+                "  /usr/lib/x86_64-linux-gnu/girepository-1.0/AyatanaAppIndicator3-0.1.typelib\n"
+            )
+            sys.exit(1)
+    IndicatorNS = ns
 
 APP_ID     = "smart-power-profiles"
+
+# Fallback polling bounds (seconds) when inotify is unavailable
+POLL_MIN = 5
+POLL_MAX = 60
 CACHE_DIR  = os.path.expanduser("~/.cache")
 STATE_FILE = os.path.join(CACHE_DIR, "powerprofile.state")   # written by daemon
 LAST_FILE  = os.path.join(CACHE_DIR, "powerprofile.last")    # last profile applied (also written by daemon)
 OVERRIDE   = os.path.join(CACHE_DIR, "powerprofile.override")
 SILENT     = os.path.join(CACHE_DIR, "powerprofile.silent")
 
-PROFILE_NAMES = {
-    "power-saver": "Power Saver",
-    "balanced": "Balanced",
-    "performance": "Performance",
+# --- inotify (via libc) so we wake up only when the daemon touches our files ---
+IN_MODIFY      = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM  = 0x00000040
+IN_MOVED_TO    = 0x00000080
+IN_CREATE      = 0x00000100
+IN_DELETE      = 0x00000200
+IN_CLOEXEC     = 0o2000000
+IN_NONBLOCK    = 0o4000
+
+# Basenames precomputed once: matched against directory events and used for
+# dir_fd-relative access below.
+BASENAME = {p: os.path.basename(p) for p in (STATE_FILE, LAST_FILE, OVERRIDE, SILENT)}
+WATCH_NAMES = set(BASENAME.values())
+
+# Hold one fd on CACHE_DIR so hot-path stat/open address the state files by
+# basename instead of re-walking the $HOME/.cache components every access.
+# Fds on the files themselves would go stale — the daemon and tray both
+# replace/unlink them — but the directory inode is stable for our lifetime.
+try:
+    CACHE_DIR_FD = os.open(CACHE_DIR, os.O_RDONLY | os.O_DIRECTORY | os.O_CLOEXEC)
+except OSError:
+    CACHE_DIR_FD = None
+
+def stat_state_file(path: str) -> os.stat_result:
+    if CACHE_DIR_FD is not None:
+        return os.stat(BASENAME[path], dir_fd=CACHE_DIR_FD)
+    return os.stat(path)
+
+def open_state_file(path: str) -> int:
+    if CACHE_DIR_FD is not None:
+        return os.open(BASENAME[path], os.O_RDONLY | os.O_CLOEXEC, dir_fd=CACHE_DIR_FD)
+    return os.open(path, os.O_RDONLY | os.O_CLOEXEC)
+
+def inotify_open() -> int | None:
+    # Watch CACHE_DIR rather than the files themselves: OVERRIDE/SILENT get
+    # created and deleted, and a per-file watch dies with the inode.
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        fd = libc.inotify_init1(IN_CLOEXEC | IN_NONBLOCK)
+        if fd < 0:
+            return None
+        mask = (IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO
+                | IN_CREATE | IN_DELETE)
+        wd = libc.inotify_add_watch(fd, os.fsencode(CACHE_DIR), mask)
+        if wd < 0:
+            os.close(fd)
+            return None
+        return fd
+    except Exception:
+        return None
+
+def inotify_hits_watched(buf: bytes) -> bool:
+    # struct inotify_event: int wd; uint32 mask, cookie, len; char name[len]
+    off = 0
+    while off + 16 <= len(buf):
+        _wd, _mask, _cookie, nlen = struct.unpack_from("iIII", buf, off)
+        name = buf[off + 16 : off + 16 + nlen].split(b"\0", 1)[0]
+        if os.fsdecode(name) in WATCH_NAMES:
+            return True
+        off += 16 + nlen
+    return False
+
+# One immutable record per profile: display title plus both tray labels,
+# precomputed once. Feeds label_for and the menu construction.
+@dataclass(frozen=True)
+class Profile:
+    key: str
+    title: str
+    auto_label: str
+    manual_label: str
+
+PROFILES = {
+    key: Profile(key, title, f"A: {title}", f"M: {title}")
+    for key, title in (
+        ("power-saver", "Power Saver"),
+        ("balanced", "Balanced"),
+        ("performance", "Performance"),
+    )
 }
 
-def sh(cmd: str) -> str:
+def sh(argv: list[str]) -> str:
     from subprocess import run, PIPE, DEVNULL
-    out = run(cmd, shell=True, stdout=PIPE, stderr=DEVNULL, text=True)
+    out = run(argv, stdout=PIPE, stderr=DEVNULL, text=True)
     return (out.stdout or "").strip()
 
 def read_cached_profile() -> str | None:
-    # Prefer STATE_FILE; fall back to LAST_FILE; else None
+    # Prefer STATE_FILE; fall back to LAST_FILE; else None.
+    # os.open reports ENOENT itself, so no separate exists() probe needed.
     for path in (STATE_FILE, LAST_FILE):
         try:
-            if os.path.exists(path):
-                with open(path, "r", encoding="utf-8") as f:
-                    val = f.read().strip()
-                if val:
-                    return val
+            fd = open_state_file(path)
+            try:
+                data = os.read(fd, 64)
+            finally:
+                os.close(fd)
+            val = data.decode().strip()
+            if val:
+                return val
         except Exception:
             pass
     return None
 
+# TTL cache for the subprocess fallback: a fork+D-Bus roundtrip costs
+# milliseconds vs microseconds for the tmpfs read, so don't repeat it
+# more than once per LIVE_TTL even if the state files stay absent.
+LIVE_TTL = 10.0
+_live_cache = {"val": None, "t": 0.0}
+
 def read_live_profile() -> str:
-    return sh("powerprofilesctl get") or "balanced"
+    now = time.monotonic()
+    if _live_cache["val"] is not None and now - _live_cache["t"] < LIVE_TTL:
+        return _live_cache["val"]
+    val = sh(["powerprofilesctl", "get"]) or "balanced"
+    _live_cache["val"] = val
+    _live_cache["t"] = now
+    return val
 
 def get_profile() -> str:
     cached = read_cached_profile()
     return cached if cached else read_live_profile()
 
 def is_auto() -> bool:
-    return not os.path.exists(OVERRIDE)
+    try:
+        stat_state_file(OVERRIDE)
+        return False
+    except OSError:
+        return True
 
 def notifications_enabled() -> bool:
-    return not os.path.exists(SILENT)
+    try:
+        stat_state_file(SILENT)
+        return False
+    except OSError:
+        return True
+
+def write_small_file(path: str, text: str):
+    # Write-then-rename so the daemon (and our own inotify handler) never
+    # observes a truncated or empty file mid-write.
+    tmp = path + ".tmp"
+    fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | os.O_CLOEXEC, 0o600)
+    try:
+        os.write(fd, text.encode())
+    finally:
+        os.close(fd)
+    os.replace(tmp, path)
 
 def set_state(mode: str):
     # Write override file (manual), or remove it (auto).
@@ -80,12 +208,16 @@ def set_state(mode: str):
             if os.path.exists(OVERRIDE):
                 os.remove(OVERRIDE)
         else:
-            with open(OVERRIDE, "w", encoding="utf-8") as f:
-                f.write(mode)
+            write_small_file(OVERRIDE, mode)
         # Ask power-profiles-daemon too; daemon will enforce if it refuses.
+        # Fire-and-forget: this runs in a menu callback on the UI thread,
+        # and waiting on the D-Bus roundtrip would stall the main loop.
         if mode != "auto":
-            from subprocess import run, DEVNULL
-            run(["powerprofilesctl", "set", mode], stdout=DEVNULL, stderr=DEVNULL)
+            from subprocess import Popen, DEVNULL
+            proc = Popen(["powerprofilesctl", "set", mode], stdout=DEVNULL, stderr=DEVNULL)
+            # Reap via the main loop: nothing else waits on the child, and a
+            # quiet tray might not construct another subprocess for hours.
+            GLib.child_watch_add(GLib.PRIORITY_DEFAULT, proc.pid, lambda _pid, _status: None)
     except Exception:
         pass
 
@@ -96,14 +228,17 @@ def toggle_notifications(enable: bool):
             if os.path.exists(SILENT):
                 os.remove(SILENT)
         else:
-            with open(SILENT, "w", encoding="utf-8") as f:
-                f.write("1")
+            write_small_file(SILENT, "1")
     except Exception:
         pass
 
 def label_for(profile: str, auto: bool) -> str:
+    p = PROFILES.get(profile)
+    if p is not None:
+        return p.auto_label if auto else p.manual_label
+    # Unknown profile string: format on the spot
     prefix = "A" if auto else "M"
-    return f"{prefix}: {PROFILE_NAMES.get(profile, profile.title())}"
+    return f"{prefix}: {profile.title()}"
 
 class Tray:
     def __init__(self):
@@ -118,31 +253,45 @@ class Tray:
         )
         self.ind.set_status(IndicatorNS.IndicatorStatus.ACTIVE)
 
+        # Some builds lack set_label/set_title; probe once, not per update
+        # (hasattr on GI objects walks the introspection tables every call).
+        self._set_label = getattr(self.ind, "set_label", None)
+        self._set_title = getattr(self.ind, "set_title", None)
+
         self._last_snapshot = None
+        self._last_mtimes = None
+        self._syncing = False  # guards callbacks against our own set_active
         self._menu_items = {}  # map profile -> Gtk.CheckMenuItem for checks
 
-        # Build UI and prime label
-        self.build_menu(initial=True)
-        self._apply_label(get_profile(), is_auto())
+        # Build UI once; build_menu also primes the label from current state
+        self.build_menu()
 
-        # Poll with GLib timer (keeps all GTK on the main thread)
-        GLib.timeout_add_seconds(1, self._tick)
+        # Wake on file events instead of polling; the daemon writes our state
+        # files, so inotify covers every change. Slow poll only as a fallback.
+        self._ino_fd = inotify_open()
+        if self._ino_fd is not None:
+            GLib.io_add_watch(self._ino_fd, GLib.IO_IN, self._on_inotify)
+        else:
+            # Adaptive fallback poll: quick while state is moving, backing
+            # off toward POLL_MAX once things settle.
+            self._poll_interval = POLL_MIN
+            GLib.timeout_add_seconds(POLL_MIN, self._poll)
 
     def _apply_label(self, profile: str, auto: bool):
         text = label_for(profile, auto)
-        if hasattr(self.ind, "set_label"):
-            # Some builds lack set_label; guard it
+        if self._set_label is not None:
             try:
-                self.ind.set_label(text, "")
+                self._set_label(text, "")
             except Exception:
                 pass
-        if hasattr(self.ind, "set_title"):
+        if self._set_title is not None:
             try:
-                self.ind.set_title(text)
+                self._set_title(text)
             except Exception:
                 pass
 
-    def build_menu(self, initial=False):
+    def build_menu(self):
+        # Constructed exactly once; _sync_menu updates check state in place.
         menu = Gtk.Menu()
         prof = get_profile()
         auto = is_auto()
@@ -151,21 +300,19 @@ class Tray:
         # Auto toggle
         it_auto = Gtk.CheckMenuItem(label="Auto Mode")
         it_auto.set_active(auto)
-        it_auto.connect("activate", self._on_auto)
+        self._h_auto = it_auto.connect("activate", self._on_auto)
+        self._it_auto = it_auto
         menu.append(it_auto)
 
         menu.append(Gtk.SeparatorMenuItem())
 
         # Manual picks (check the active one only when in Manual)
         self._menu_items.clear()
-        for title, mode in [
-            ("Power Saver", "power-saver"),
-            ("Balanced", "balanced"),
-            ("Performance", "performance"),
-        ]:
-            mi = Gtk.CheckMenuItem(label=title)
+        self._pick_handlers = {}
+        for mode, p in PROFILES.items():
+            mi = Gtk.CheckMenuItem(label=p.title)
             mi.set_active((prof == mode) and (not auto))
-            mi.connect("activate", self._on_pick, mode)
+            self._pick_handlers[mode] = mi.connect("activate", self._on_pick, mode)
             self._menu_items[mode] = mi
             menu.append(mi)
 
@@ -174,7 +321,8 @@ class Tray:
         # Notifications toggle
         it_notif = Gtk.CheckMenuItem(label="Notifications")
         it_notif.set_active(notify)
-        it_notif.connect("activate", self._on_notify)
+        self._h_notif = it_notif.connect("activate", self._on_notify)
+        self._it_notif = it_notif
         menu.append(it_notif)
 
         menu.append(Gtk.SeparatorMenuItem())
@@ -188,39 +336,105 @@ class Tray:
         # Update label on build
         self._apply_label(prof, auto)
 
-    # Callbacks
+    def _sync_menu(self, prof: str, auto: bool, notify: bool):
+        # Flip only the checkmarks that changed, with our handlers blocked so
+        # a programmatic set_active can't loop back into the callbacks.
+        targets = [
+            (self._it_auto, self._h_auto, auto),
+            (self._it_notif, self._h_notif, notify),
+        ]
+        for mode, mi in self._menu_items.items():
+            targets.append((mi, self._pick_handlers[mode], (prof == mode) and (not auto)))
+        self._syncing = True
+        try:
+            for item, hid, active in targets:
+                if item.get_active() != active:
+                    item.handler_block(hid)
+                    item.set_active(active)
+                    item.handler_unblock(hid)
+        finally:
+            self._syncing = False
+
+    def _refresh(self, auto: bool | None = None, notify: bool | None = None):
+        prof = get_profile()
+        if auto is None:
+            auto = is_auto()
+        if notify is None:
+            notify = notifications_enabled()
+        snap = (prof, auto, notify)
+        if snap != self._last_snapshot:
+            self._apply_label(prof, auto)
+            self._sync_menu(prof, auto, notify)
+            self._last_snapshot = snap
+
+    # Callbacks (ignored while _sync_menu is flipping checkmarks itself)
     def _on_auto(self, w):
+        if self._syncing:
+            return
         set_state("auto" if w.get_active() else "balanced")
-        self.build_menu()
+        self._refresh()
 
     def _on_pick(self, w, mode):
+        if self._syncing:
+            return
         # Only act on "check" events that are turning on
         if not w.get_active():
             return
         set_state(mode)
-        # Reflect single-selection behavior among manual picks
-        for m, item in self._menu_items.items():
-            if m != mode:
-                item.set_active(False)
-        self.build_menu()
+        # _refresh unchecks the other manual picks via _sync_menu
+        self._refresh()
 
     def _on_notify(self, w):
+        if self._syncing:
+            return
         toggle_notifications(w.get_active())
-        self.build_menu()
+        self._refresh()
 
-    # Periodic tick (returns True to keep the timer)
+    # inotify fd became readable; drain it and refresh if our files moved.
+    # We run on the GLib main loop already, so we call _tick directly.
+    def _on_inotify(self, fd, _cond):
+        try:
+            buf = os.read(fd, 4096)
+        except OSError:
+            return True
+        if inotify_hits_watched(buf):
+            self._tick()
+        return True
+
+    # Fallback when inotify is unavailable: poll, doubling the interval each
+    # quiet pass and snapping back to POLL_MIN as soon as something changes.
+    def _poll(self):
+        before = self._last_mtimes
+        self._tick()
+        if self._last_mtimes != before:
+            self._poll_interval = POLL_MIN
+        else:
+            self._poll_interval = min(self._poll_interval * 2, POLL_MAX)
+        GLib.timeout_add_seconds(self._poll_interval, self._poll)
+        return False  # one-shot; re-armed above with the new interval
+
+    # Refresh pass (returns True so it can sit on a GLib timer)
     def _tick(self):
-        prof = get_profile()
-        auto = is_auto()
-        notify = notifications_enabled()
-        snap = (prof, auto, notify)
-        if snap != self._last_snapshot:
-            self._apply_label(prof, auto)
-            self.build_menu()
-            self._last_snapshot = snap
+        # Fast path: if no state file's mtime moved, nothing to re-read.
+        # The daemon can rewrite STATE_FILE with identical content, so this
+        # also absorbs flapping events before any reads or menu work.
+        # One stat per file; ENOENT doubles as the existence probe, so the
+        # override/silent checks below reuse these results for free.
+        mtimes = []
+        for p in (STATE_FILE, LAST_FILE, OVERRIDE, SILENT):
+            try:
+                mtimes.append(stat_state_file(p).st_mtime_ns)
+            except OSError:
+                mtimes.append(0)
+        mtimes = tuple(mtimes)
+        if mtimes == self._last_mtimes:
+            return True
+        self._last_mtimes = mtimes
+        self._refresh(auto=(mtimes[2] == 0), notify=(mtimes[3] == 0))
         return True
 
 def main():
+    load_gi()
     try:
         Gtk.set_prgname(APP_ID)
     except Exception: